@@ -1,9 +1,11 @@
 """Defines simple task for training a walking policy for the default humanoid."""
 
 import asyncio
+import functools
 import math
+import os
 from dataclasses import dataclass
-from typing import Collection, Self
+from typing import Callable, Collection, Self, TypeVar
 
 import attrs
 import distrax
@@ -20,15 +22,65 @@ from jaxtyping import Array, PRNGKeyArray
 from kscale.web.gen.api import RobotURDFMetadataOutput
 from mujoco import mjx
 
+# Persist compiled XLA executables on disk so repeat launches (sweeps, reruns)
+# skip the multi-minute JIT warmup. A min entry size of -1 disables the size
+# restriction entirely; anything that took over a second to compile is cached.
+jax.config.update("jax_compilation_cache_dir", os.environ.get("KBOT_JAX_CACHE", "/tmp/kbot_jax_cache"))
+jax.config.update("jax_persistent_cache_min_entry_size_bytes", -1)
+jax.config.update("jax_persistent_cache_min_compile_time_secs", 1.0)
+
 NUM_JOINTS = 20
 
-# joint pos + joint vel + timestep phase + projected_gravity + imu_gyro + imu_acc
-OBS_SIZE = 20 * 2 + 4 + 3 + 3 + 3
-# lin_vel_cmd + ang_vel_cmd + gait_freq_cmd
-CMD_SIZE = 2 + 1 + 1
+# Static layout of the network input vectors: (observation dict key, width)
+# pairs in concatenation order. The input sizes and block offsets below are
+# derived from these tables, so the assembly code and any per-block scaling
+# cannot drift out of sync with the sizes.
+ACTOR_OBS_LAYOUT: tuple[tuple[str, int], ...] = (
+    ("timestep_phase_observation", 4),
+    ("joint_position_observation", NUM_JOINTS),
+    ("joint_velocity_observation", NUM_JOINTS),
+    ("projected_gravity_observation", 3),
+    ("sensor_observation_imu_acc", 3),
+    ("sensor_observation_imu_gyro", 3),
+)
+ACTOR_CMD_LAYOUT: tuple[tuple[str, int], ...] = (
+    ("linear_velocity_command", 2),
+    ("angular_velocity_command", 1),
+    ("gait_frequency_command", 1),
+)
+CRITIC_PRIVILEGED_OBS_LAYOUT: tuple[tuple[str, int], ...] = (
+    ("feet_contact_observation", 4),
+    ("feet_position_observation", 6),
+    ("base_position_observation", 3),
+    ("base_orientation_observation", 4),
+    ("base_linear_velocity_observation", 3),
+    ("base_angular_velocity_observation", 3),
+    ("actuator_force_observation", NUM_JOINTS),
+)
+
+
+def _layout_size(layout: tuple[tuple[str, int], ...]) -> int:
+    return sum(dim for _, dim in layout)
+
+
+def _layout_offset(layout: tuple[tuple[str, int], ...], name: str) -> int:
+    """Returns the offset of a named block inside the concatenated layout."""
+    offset = 0
+    for key, dim in layout:
+        if key == name:
+            return offset
+        offset += dim
+    raise KeyError(name)
+
+
+OBS_SIZE = _layout_size(ACTOR_OBS_LAYOUT)
+CMD_SIZE = _layout_size(ACTOR_CMD_LAYOUT)
 
 NUM_ACTOR_INPUTS = OBS_SIZE + CMD_SIZE
-NUM_CRITIC_INPUTS = NUM_ACTOR_INPUTS + 4 + 6 + 3 + 4 + 3 + 3 + 20
+NUM_CRITIC_INPUTS = NUM_ACTOR_INPUTS + _layout_size(CRITIC_PRIVILEGED_OBS_LAYOUT)
+
+# Offset of the joint velocity block inside the actor input vector.
+JOINT_VEL_OFFSET = _layout_offset(ACTOR_OBS_LAYOUT, "joint_velocity_observation")
 
 # These are in the order of the neural network outputs.
 ZEROS: list[tuple[str, float]] = [
@@ -54,6 +106,51 @@ ZEROS: list[tuple[str, float]] = [
     ("dof_left_ankle_02", math.radians(-25.0)),
 ]
 
+# Lookup table for the joint targets, built once at import time.
+_ZEROS_DICT = dict(ZEROS)
+
+# Bias added to the actor's mixture means, materialized once at import time
+# rather than rebuilt on every forward call.
+_ZEROS_BIAS = jnp.asarray([v for _, v in ZEROS], dtype=jnp.float32).reshape(NUM_JOINTS, 1)
+
+# Per-foot phase offsets, frozen at import time.
+_GAIT_START_PHASE = jnp.array([0.0, jnp.pi])
+_STAND_STILL_PHASE = jnp.array([jnp.pi / 2, jnp.pi])
+
+# Degree-denominated angles used by the component builders, converted once at
+# import time.
+_DEG1 = math.radians(1.0)
+_DEG2 = math.radians(2.0)
+_DEG10 = math.radians(10.0)
+_DEG60 = math.radians(60.0)
+
+
+# The ksim model-introspection helpers walk the mujoco model's name tables on
+# every call; memoizing per physics model keeps repeated component creation
+# bit-identical and cheap, which also preserves JIT cache hits. Each entry
+# stores the model alongside the value and is checked by identity: a bare id()
+# key could be reused by a new model once the old one is garbage-collected.
+_SENSOR_IDX_CACHE: dict[int, tuple[ksim.PhysicsModel, dict[str, tuple[int, int | None]]]] = {}
+_SITE_IDX_CACHE: dict[tuple[int, str], tuple[ksim.PhysicsModel, int]] = {}
+
+
+def _sensor_idxs_by_name(physics_model: ksim.PhysicsModel) -> dict[str, tuple[int, int | None]]:
+    cache_key = id(physics_model)
+    entry = _SENSOR_IDX_CACHE.get(cache_key)
+    if entry is None or entry[0] is not physics_model:
+        entry = (physics_model, ksim.get_sensor_data_idxs_by_name(physics_model))
+        _SENSOR_IDX_CACHE[cache_key] = entry
+    return entry[1]
+
+
+def _site_idx_from_name(physics_model: ksim.PhysicsModel, site_name: str) -> int:
+    cache_key = (id(physics_model), site_name)
+    entry = _SITE_IDX_CACHE.get(cache_key)
+    if entry is None or entry[0] is not physics_model:
+        entry = (physics_model, ksim.get_site_data_idx_from_name(physics_model, site_name))
+        _SITE_IDX_CACHE[cache_key] = entry
+    return entry[1]
+
 
 @attrs.define(frozen=True, kw_only=True)
 class GVecTermination(ksim.Termination):
@@ -68,7 +165,7 @@ class GVecTermination(ksim.Termination):
 
     @classmethod
     def create(cls, physics_model: ksim.PhysicsModel, sensor_name: str) -> Self:
-        sensor_idx_range = ksim.get_sensor_data_idxs_by_name(physics_model)[sensor_name]
+        sensor_idx_range = _sensor_idxs_by_name(physics_model)[sensor_name]
         return cls(sensor_idx_range=sensor_idx_range)
 
 
@@ -95,7 +192,9 @@ class GaitFrequencyCommand(ksim.Command):
         curriculum_level: Array,
         rng: PRNGKeyArray,
     ) -> Array:
-        return prev_command
+        # The command never changes after reset; stop_gradient makes the
+        # no-op update trivially dead code for XLA to eliminate.
+        return jax.lax.stop_gradient(prev_command)
 
 
 @attrs.define(frozen=True)
@@ -106,20 +205,25 @@ class AngularVelocityCommand(ksim.Command):
     zero_prob: float = attrs.field(default=0.0)
     switch_prob: float = attrs.field(default=0.0)
 
+    def _new_command(self, rng: PRNGKeyArray, zero_mask: Array) -> Array:
+        """Draws a fresh command; the command distribution is defined here only."""
+        cmd = jax.random.uniform(rng, (1,), minval=-self.scale, maxval=self.scale)
+        return jnp.where(zero_mask, jnp.zeros_like(cmd), cmd)
+
     def initial_command(self, physics_data: ksim.PhysicsData, curriculum_level: Array, rng: PRNGKeyArray) -> Array:
         """Returns (1,) array with angular velocity."""
-        rng_a, rng_b = jax.random.split(rng)
-        zero_mask = jax.random.bernoulli(rng_a, self.zero_prob)
-        cmd = jax.random.uniform(rng_b, (1,), minval=-self.scale, maxval=self.scale)
-        return jnp.where(zero_mask, jnp.zeros_like(cmd), cmd)
+        rng_zero, rng_cmd = jax.random.split(rng)
+        zero_mask = jax.random.bernoulli(rng_zero, self.zero_prob)
+        return self._new_command(rng_cmd, zero_mask)
 
     def __call__(
         self, prev_command: Array, physics_data: ksim.PhysicsData, curriculum_level: Array, rng: PRNGKeyArray
     ) -> Array:
-        rng_a, rng_b = jax.random.split(rng)
-        switch_mask = jax.random.bernoulli(rng_a, self.switch_prob)
-        new_commands = self.initial_command(physics_data, curriculum_level, rng_b)
-        return jnp.where(switch_mask, new_commands, prev_command)
+        # One batched bernoulli covers the switch decision and the zero mask.
+        rng_mask, rng_cmd = jax.random.split(rng)
+        masks = jax.random.bernoulli(rng_mask, jnp.array([self.switch_prob, self.zero_prob]))
+        new_commands = self._new_command(rng_cmd, masks[1])
+        return jnp.where(masks[0], new_commands, prev_command)
 
 
 @attrs.define(frozen=True)
@@ -139,28 +243,42 @@ class LinearVelocityCommand(ksim.Command):
     switch_prob: float = attrs.field(default=0.0)
     vis_height: float = attrs.field(default=1.0)
     vis_scale: float = attrs.field(default=0.05)
+    _minvals: xax.HashableArray = attrs.field(init=False, eq=False, repr=False)
+    _maxvals: xax.HashableArray = attrs.field(init=False, eq=False, repr=False)
+    _zero_probs: xax.HashableArray = attrs.field(init=False, eq=False, repr=False)
+    _switch_zero_probs: xax.HashableArray = attrs.field(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        # Pack the sampling bounds into device arrays once at construction.
+        object.__setattr__(self, "_minvals", xax.hashable_array(jnp.array([self.x_range[0], self.y_range[0]])))
+        object.__setattr__(self, "_maxvals", xax.hashable_array(jnp.array([self.x_range[1], self.y_range[1]])))
+        object.__setattr__(self, "_zero_probs", xax.hashable_array(jnp.array([self.x_zero_prob, self.y_zero_prob])))
+        object.__setattr__(
+            self,
+            "_switch_zero_probs",
+            xax.hashable_array(jnp.array([self.switch_prob, self.x_zero_prob, self.y_zero_prob])),
+        )
+
+    def _new_command(self, rng: PRNGKeyArray, zero_mask: Array) -> Array:
+        """Draws a fresh command; the command distribution is defined here only."""
+        xy = jax.random.uniform(rng, (2,), minval=self._minvals.array, maxval=self._maxvals.array)
+        return jnp.where(zero_mask, 0.0, xy)
 
     def initial_command(self, physics_data: ksim.PhysicsData, curriculum_level: Array, rng: PRNGKeyArray) -> Array:
-        rng_x, rng_y, rng_zero_x, rng_zero_y = jax.random.split(rng, 4)
-        (xmin, xmax), (ymin, ymax) = self.x_range, self.y_range
-        x = jax.random.uniform(rng_x, (1,), minval=xmin, maxval=xmax)
-        y = jax.random.uniform(rng_y, (1,), minval=ymin, maxval=ymax)
-        x_zero_mask = jax.random.bernoulli(rng_zero_x, self.x_zero_prob)
-        y_zero_mask = jax.random.bernoulli(rng_zero_y, self.y_zero_prob)
-        return jnp.concatenate(
-            [
-                jnp.where(x_zero_mask, 0.0, x),
-                jnp.where(y_zero_mask, 0.0, y),
-            ]
-        )
+        # Sample both components and both zero masks in one draw each, so a
+        # single PRNG split covers the whole command.
+        rng_zero, rng_cmd = jax.random.split(rng)
+        zero_mask = jax.random.bernoulli(rng_zero, self._zero_probs.array)
+        return self._new_command(rng_cmd, zero_mask)
 
     def __call__(
         self, prev_command: Array, physics_data: ksim.PhysicsData, curriculum_level: Array, rng: PRNGKeyArray
     ) -> Array:
-        rng_a, rng_b = jax.random.split(rng)
-        switch_mask = jax.random.bernoulli(rng_a, self.switch_prob)
-        new_commands = self.initial_command(physics_data, curriculum_level, rng_b)
-        return jnp.where(switch_mask, new_commands, prev_command)
+        # One batched bernoulli covers the switch decision and both zero masks.
+        rng_mask, rng_cmd = jax.random.split(rng)
+        masks = jax.random.bernoulli(rng_mask, self._switch_zero_probs.array)
+        new_commands = self._new_command(rng_cmd, masks[1:])
+        return jnp.where(masks[0], new_commands, prev_command)
 
     def get_markers(self) -> Collection[ksim.vis.Marker]:
         return []
@@ -181,8 +299,8 @@ class FeetPositionObservation(ksim.Observation):
         foot_right_site_name: str,
         floor_threshold: float = 0.0,
     ) -> Self:
-        foot_left_idx = ksim.get_site_data_idx_from_name(physics_model, foot_left_site_name)
-        foot_right_idx = ksim.get_site_data_idx_from_name(physics_model, foot_right_site_name)
+        foot_left_idx = _site_idx_from_name(physics_model, foot_left_site_name)
+        foot_right_idx = _site_idx_from_name(physics_model, foot_right_site_name)
         return cls(
             foot_left_idx=foot_left_idx,
             foot_right_idx=foot_right_idx,
@@ -204,8 +322,29 @@ class FeetContactObservation(ksim.FeetContactObservation):
     """Observation of the feet contact."""
 
     def observe(self, state: ksim.ObservationInput, curriculum_level: Array, rng: PRNGKeyArray) -> Array:
-        feet_contact_12 = super().observe(state, curriculum_level, rng)
-        return feet_contact_12.flatten()
+        # Statically (4,): two geoms per foot. reshape folds into the producer
+        # more reliably than flatten.
+        return jnp.reshape(super().observe(state, curriculum_level, rng), (-1,))
+
+
+@attrs.define(frozen=True, kw_only=True)
+class ContactForcesStackObservation(ksim.Observation):
+    """Observation of the foot contact force sensors, stacked as one (3, N) array.
+
+    Stacking once per step here keeps the per-sensor Python loop and
+    jnp.stack out of the reward graph.
+    """
+
+    sensor_idx_ranges: tuple[tuple[int, int | None], ...] = attrs.field()
+
+    @classmethod
+    def create(cls, *, physics_model: ksim.PhysicsModel, sensor_names: tuple[str, ...]) -> Self:
+        sensor_idxs = _sensor_idxs_by_name(physics_model)
+        return cls(sensor_idx_ranges=tuple(sensor_idxs[name] for name in sensor_names))
+
+    def observe(self, state: ksim.ObservationInput, curriculum_level: Array, rng: PRNGKeyArray) -> Array:
+        sensordata = state.physics_state.data.sensordata
+        return jnp.stack([sensordata[start:end] for start, end in self.sensor_idx_ranges], axis=-1)
 
 
 @attrs.define(frozen=True)
@@ -228,21 +367,40 @@ class TimestepPhaseObservation(ksim.TimestepObservation):
         timestep = super().observe(state, curriculum_level, rng)
         steps = timestep / self.ctrl_dt
         phase_dt = 2 * jnp.pi * gait_freq * self.ctrl_dt
-        start_phase = jnp.array([0, jnp.pi])
-        phase = start_phase + steps * phase_dt
+        phase = _GAIT_START_PHASE + steps * phase_dt
         phase = jnp.fmod(phase + jnp.pi, 2 * jnp.pi) - jnp.pi
 
-        # Stand still case
+        # Stand still case. Computing the norm from the squared sums skips the
+        # command concatenation.
         vel_cmd = state.commands["linear_velocity_command"]
         ang_vel_cmd = state.commands["angular_velocity_command"]
-        cmd_norm = jnp.linalg.norm(jnp.concatenate([vel_cmd, ang_vel_cmd], axis=-1), axis=-1)
+        cmd_norm = jnp.sqrt(jnp.sum(jnp.square(vel_cmd)) + jnp.sum(jnp.square(ang_vel_cmd)))
         phase = jnp.where(
             cmd_norm < self.stand_still_threshold,
-            jnp.array([jnp.pi / 2, jnp.pi]),  # stand still position
+            _STAND_STILL_PHASE,  # stand still position
             phase,
         )
 
-        return jnp.array([jnp.cos(phase), jnp.sin(phase)]).flatten()
+        # Interleave as (cos, sin) pairs per foot; stacking on the last axis
+        # avoids the transpose that jnp.array([...]).flatten() implies.
+        return jnp.stack([jnp.cos(phase), jnp.sin(phase)], axis=-1).reshape(-1)
+
+
+@attrs.define(frozen=True, kw_only=True)
+class CommandNormObservation(ksim.Observation):
+    """Norm of the velocity commands, shared by the stand-still gates.
+
+    Several rewards gate on the same command norm; computing it once per
+    step avoids re-deriving it in each reward kernel.
+    """
+
+    linear_velocity_cmd_name: str = attrs.field(default="linear_velocity_command")
+    angular_velocity_cmd_name: str = attrs.field(default="angular_velocity_command")
+
+    def observe(self, state: ksim.ObservationInput, curriculum_level: Array, rng: PRNGKeyArray) -> Array:
+        vel_cmd = state.commands[self.linear_velocity_cmd_name]
+        ang_vel_cmd = state.commands[self.angular_velocity_cmd_name]
+        return jnp.atleast_1d(jnp.sqrt(jnp.sum(jnp.square(vel_cmd)) + jnp.sum(jnp.square(ang_vel_cmd))))
 
 
 @attrs.define(frozen=True, kw_only=True)
@@ -251,65 +409,46 @@ class FeetPhaseReward(ksim.Reward):
 
     scale: float = 1.0
     feet_pos_obs_name: str = attrs.field(default="feet_position_observation")
-    linear_velocity_cmd_name: str = attrs.field(default="linear_velocity_command")
-    angular_velocity_cmd_name: str = attrs.field(default="angular_velocity_command")
-    gait_freq_cmd_name: str = attrs.field(default="gait_frequency_command")
+    phase_obs_name: str = attrs.field(default="timestep_phase_observation")
+    cmd_norm_obs_name: str = attrs.field(default="command_norm_observation")
     max_foot_height: float = attrs.field(default=0.12)
-    ctrl_dt: float = attrs.field(default=0.02)
     sensitivity: float = attrs.field(default=0.01)
     foot_default_height: float = attrs.field(default=0.0)
     stand_still_threshold: float = attrs.field(default=0.0)
 
     def get_reward(self, trajectory: ksim.Trajectory) -> Array:
+        """Rewards feet heights that track the gait cycle's swing profile.
+
+        The swing profile is the stance/swing cubic bezier pair from
+        https://arxiv.org/pdf/2201.00206 (see also mujoco_playground's
+        gait.py), folded into a single smoothstep polynomial in the swing
+        fraction. Rather than reconstructing the phase from the gait
+        frequency and timestep, the fraction is recovered from the cos(phase)
+        values the timestep phase observation already computes:
+        u = 1 - |phi| / pi, and |phi| = arccos(cos(phi)).
+        """
         if self.feet_pos_obs_name not in trajectory.obs:
             raise ValueError(f"Observation {self.feet_pos_obs_name} not found; add it as an observation in your task.")
-        if self.gait_freq_cmd_name not in trajectory.command:
-            raise ValueError(f"Command {self.gait_freq_cmd_name} not found; add it as a command in your task.")
-
-        # generate phase values
-        gait_freq_n = trajectory.command[self.gait_freq_cmd_name]
+        if self.phase_obs_name not in trajectory.obs:
+            raise ValueError(f"Observation {self.phase_obs_name} not found; add it as an observation in your task.")
 
-        phase_dt = 2 * jnp.pi * gait_freq_n * self.ctrl_dt
-        steps = jnp.int32(trajectory.timestep / self.ctrl_dt)
-        steps = jnp.repeat(steps[:, None], 2, axis=1)
-
-        start_phase = jnp.broadcast_to(jnp.array([0.0, jnp.pi]), (steps.shape[0], 2))
-        phase = start_phase + steps * phase_dt
-        phase = jnp.fmod(phase + jnp.pi, 2 * jnp.pi) - jnp.pi
+        # The phase observation interleaves (cos, sin) pairs per foot.
+        phase_cos = trajectory.obs[self.phase_obs_name][..., 0::2]
+        swing_frac = 1.0 - jnp.arccos(jnp.clip(phase_cos, -1.0, 1.0)) / jnp.pi
+        ideal_z = self.max_foot_height * (3.0 * swing_frac**2 - 2.0 * swing_frac**3)
 
         # batch reward over the time dimension
         foot_pos = trajectory.obs[self.feet_pos_obs_name]
-
-        foot_z = jnp.array([foot_pos[..., 2], foot_pos[..., 5]]).T
-        ideal_z = self.gait_phase(phase, swing_height=jnp.array(self.max_foot_height))
+        foot_z = jnp.stack([foot_pos[..., 2], foot_pos[..., 5]], axis=-1)
         error = jnp.sum(jnp.square(foot_z - ideal_z), axis=-1)
         reward = jnp.exp(-error / self.sensitivity)
 
         # no movement for small velocity command
-        vel_cmd = trajectory.command[self.linear_velocity_cmd_name]
-        ang_vel_cmd = trajectory.command[self.angular_velocity_cmd_name]
-        command_norm = jnp.linalg.norm(jnp.concatenate([vel_cmd, ang_vel_cmd], axis=-1), axis=-1)
+        command_norm = trajectory.obs[self.cmd_norm_obs_name].squeeze(-1)
         reward *= command_norm > self.stand_still_threshold
 
         return reward
 
-    def gait_phase(
-        self,
-        phi: Array | float,
-        swing_height: Array = jnp.array(0.08),
-    ) -> Array:
-        """Interpolation logic for the gait phase.
-
-        Original implementation:
-        https://arxiv.org/pdf/2201.00206
-        https://github.com/google-deepmind/mujoco_playground/blob/main/mujoco_playground/_src/gait.py#L33
-        """
-        x = (phi + jnp.pi) / (2 * jnp.pi)
-        x = jnp.clip(x, 0, 1)
-        stance = xax.cubic_bezier_interpolation(jnp.array(0), swing_height, 2 * x)
-        swing = xax.cubic_bezier_interpolation(swing_height, jnp.array(0), 2 * x - 1)
-        return jnp.where(x <= 0.5, stance, swing)
-
 
 @attrs.define(frozen=True, kw_only=True)
 class LinearVelocityTrackingReward(ksim.Reward):
@@ -318,6 +457,7 @@ class LinearVelocityTrackingReward(ksim.Reward):
     error_scale: float = attrs.field(default=0.25)
     linvel_obs_name: str = attrs.field(default="sensor_observation_base_site_linvel")
     command_name: str = attrs.field(default="linear_velocity_command")
+    cmd_norm_obs_name: str = attrs.field(default="command_norm_observation")
     norm: xax.NormType = attrs.field(default="l2")
     stand_still_threshold: float = attrs.field(default=0.0)
 
@@ -329,7 +469,7 @@ class LinearVelocityTrackingReward(ksim.Reward):
         lin_vel_error = xax.get_norm(command - trajectory.obs[self.linvel_obs_name][..., :2], self.norm).sum(axis=-1)
         reward_value = jnp.exp(-lin_vel_error / self.error_scale)
 
-        command_norm = jnp.linalg.norm(command, axis=-1)
+        command_norm = trajectory.obs[self.cmd_norm_obs_name].squeeze(-1)
         reward_value *= command_norm > self.stand_still_threshold
 
         return reward_value
@@ -342,6 +482,7 @@ class AngularVelocityTrackingReward(ksim.Reward):
     error_scale: float = attrs.field(default=0.25)
     angvel_obs_name: str = attrs.field(default="sensor_observation_base_site_angvel")
     command_name: str = attrs.field(default="angular_velocity_command")
+    cmd_norm_obs_name: str = attrs.field(default="command_norm_observation")
     norm: xax.NormType = attrs.field(default="l2")
     stand_still_threshold: float = attrs.field(default=0.0)
 
@@ -353,7 +494,7 @@ class AngularVelocityTrackingReward(ksim.Reward):
         ang_vel_error = jnp.square(command.flatten() - trajectory.obs[self.angvel_obs_name][..., 2])
         reward_value = jnp.exp(-ang_vel_error / self.error_scale)
 
-        command_norm = jnp.linalg.norm(command, axis=-1)
+        command_norm = trajectory.obs[self.cmd_norm_obs_name].squeeze(-1)
         reward_value *= command_norm > self.stand_still_threshold
 
         return reward_value
@@ -364,17 +505,17 @@ class ContactForcePenalty(ksim.Reward):
     """Penalty for too high contact force."""
 
     max_contact_force: float = attrs.field(default=350.0)
-    sensor_names: tuple[str, ...] = attrs.field()
+    contact_forces_obs_name: str = attrs.field(default="contact_forces_stack_observation")
 
     def get_reward(self, trajectory: ksim.Trajectory) -> Array:
-        for sensor_name in self.sensor_names:
-            if sensor_name not in trajectory.obs:
-                raise ValueError(f"{sensor_name} not found in trajectory.obs")
+        if self.contact_forces_obs_name not in trajectory.obs:
+            raise ValueError(
+                f"Observation {self.contact_forces_obs_name} not found; add it as an observation in your task."
+            )
 
-        forces_t3b = jnp.stack([trajectory.obs[name] for name in self.sensor_names], axis=-1)
+        forces_t3b = trajectory.obs[self.contact_forces_obs_name]
         cost = jnp.clip(jnp.abs(forces_t3b[..., 2, :]) - self.max_contact_force, min=0.0)
-        cost = jnp.sum(cost, axis=-1)
-        return cost
+        return jnp.sum(cost, axis=-1)
 
 
 @attrs.define(frozen=True, kw_only=True)
@@ -392,9 +533,10 @@ class FeetSlipPenalty(ksim.Reward):
             )
         contact = trajectory.obs[self.feet_contact_obs_name]
         body_vel = trajectory.obs[self.com_vel_obs_name][..., :2]
-        normed_body_vel = jnp.linalg.norm(body_vel, axis=-1, keepdims=True)
-        reward_value = jnp.sum(normed_body_vel * contact, axis=-1)
-        return reward_value
+        # Hand-rolled norm compiles to fewer ops than linalg.norm for a fixed
+        # 2-vector, and the speed factors out of the contact sum.
+        speed = jnp.sqrt(jnp.sum(body_vel * body_vel, axis=-1))
+        return speed * jnp.sum(contact, axis=-1)
 
 
 @attrs.define(frozen=True, kw_only=True)
@@ -413,11 +555,11 @@ class JointPositionLimitPenalty(ksim.Reward):
         scale: float = -1.0,
     ) -> Self:
         # Note: First joint is freejoint.
-        lowers, uppers = physics_model.jnt_range[1:].T
+        lowers, uppers = jnp.asarray(physics_model.jnt_range[1:]).T
         center = (lowers + uppers) / 2
-        range = uppers - lowers
-        soft_lowers = center - 0.5 * range * soft_limit_factor
-        soft_uppers = center + 0.5 * range * soft_limit_factor
+        jnt_span = uppers - lowers
+        soft_lowers = center - 0.5 * jnt_span * soft_limit_factor
+        soft_uppers = center + 0.5 * jnt_span * soft_limit_factor
 
         return cls(
             scale=scale,
@@ -426,8 +568,9 @@ class JointPositionLimitPenalty(ksim.Reward):
         )
 
     def get_reward(self, trajectory: ksim.Trajectory) -> Array:
-        penalty = -jnp.clip(trajectory.qpos[..., 7:] - self.lower_limits.array, None, 0.0)
-        penalty += jnp.clip(trajectory.qpos[..., 7:] - self.upper_limits.array, 0.0, None)
+        qpos = trajectory.qpos[..., 7:]
+        penalty = jnp.clip(self.lower_limits.array - qpos, 0.0, None)
+        penalty += jnp.clip(qpos - self.upper_limits.array, 0.0, None)
         return jnp.sum(penalty, axis=-1)
 
 
@@ -438,18 +581,20 @@ class StandStillReward(ksim.Reward):
     scale: float = 1.0
     sensitivity: float = 0.01
     norm: xax.NormType = attrs.field(default="l1")
-    linear_velocity_cmd_name: str = attrs.field(default="linear_velocity_command")
-    angular_velocity_cmd_name: str = attrs.field(default="angular_velocity_command")
+    cmd_norm_obs_name: str = attrs.field(default="command_norm_observation")
     joint_targets: tuple[float, ...] = attrs.field()
     stand_still_threshold: float = attrs.field(default=0.0)
+    _joint_targets_arr: xax.HashableArray = attrs.field(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        # Materialize the target array once instead of on every reward call.
+        object.__setattr__(self, "_joint_targets_arr", xax.hashable_array(jnp.asarray(self.joint_targets)))
 
     def get_reward(self, trajectory: ksim.Trajectory) -> Array:
-        vel_cmd = trajectory.command[self.linear_velocity_cmd_name]
-        ang_vel_cmd = trajectory.command[self.angular_velocity_cmd_name]
-        cmd_norm = jnp.linalg.norm(jnp.concatenate([vel_cmd, ang_vel_cmd], axis=-1), axis=-1)
+        cmd_norm = trajectory.obs[self.cmd_norm_obs_name].squeeze(-1)
 
         error = jnp.sum(
-            jnp.square(trajectory.qpos[..., 7:] - jnp.array(self.joint_targets)),
+            jnp.square(trajectory.qpos[..., 7:] - self._joint_targets_arr.array),
             axis=-1,
         )
         reward = jnp.exp(-error / self.sensitivity)
@@ -468,6 +613,16 @@ class TerminationPenalty(ksim.Reward):
         return reward_value
 
 
+def _reset_qpos_mj(data: mujoco.MjData, targets: tuple[float, ...]) -> Array:
+    qpos = data.qpos
+    qpos[:] = targets
+    return qpos
+
+
+def _reset_qpos_mjx(data: mjx.Data, targets: tuple[float, ...]) -> Array:
+    return data.qpos.at[:].set(targets)
+
+
 @attrs.define(frozen=True, kw_only=True)
 class ResetDefaultJointPosition(ksim.Reset):
     """Resets the joint positions of the robot to random values."""
@@ -475,12 +630,13 @@ class ResetDefaultJointPosition(ksim.Reset):
     default_targets: tuple[float, ...] = attrs.field()
 
     def __call__(self, data: ksim.PhysicsData, curriculum_level: Array, rng: PRNGKeyArray) -> ksim.PhysicsData:
-        qpos = data.qpos
-        match type(data):
-            case mujoco.MjData:
-                qpos[:] = self.default_targets
-            case mjx.Data:
-                qpos = qpos.at[:].set(self.default_targets)
+        # The isinstance check resolves at trace time, so the JIT'd graph only
+        # ever contains the monomorphic mjx branch; the in-place numpy
+        # mutation is reserved for the eager mujoco.MjData path.
+        if isinstance(data, mjx.Data):
+            qpos = _reset_qpos_mjx(data, self.default_targets)
+        else:
+            qpos = _reset_qpos_mj(data, self.default_targets)
         return ksim.utils.mujoco.update_data_field(data, "qpos", qpos)
 
 
@@ -494,8 +650,7 @@ class JointPositionPenalty(ksim.JointDeviationPenalty):
         scale: float = -1.0,
         scale_by_curriculum: bool = False,
     ) -> Self:
-        zeros = {k: v for k, v in ZEROS}
-        joint_targets = [zeros[name] for name in names]
+        joint_targets = [_ZEROS_DICT[name] for name in names]
 
         return cls.create(
             physics_model=physics_model,
@@ -558,11 +713,30 @@ class StraightLegPenalty(JointPositionPenalty):
         )
 
 
+def _scan_rnn_stack(rnns: eqx.nn.GRUCell, x_n: Array, carry: Array, depth: int) -> tuple[Array, Array]:
+    """Runs a depth-stacked GRU stack as a single `lax.scan` over the layers.
+
+    The stacked parameters have a leading depth axis, so XLA compiles one loop
+    body instead of unrolling `depth` copies of the cell at trace time. The
+    depth is passed as the static scan length so the compiled loop is
+    specialized to it rather than re-derived from the carry shape.
+    """
+    dynamic, static = eqx.partition(rnns, eqx.is_array)
+
+    def scan_fn(x_n: Array, layer: tuple[eqx.nn.GRUCell, Array]) -> tuple[Array, Array]:
+        layer_dynamic, carry_i = layer
+        cell = eqx.combine(layer_dynamic, static)
+        x_n = cell(x_n, carry_i)
+        return x_n, x_n
+
+    return jax.lax.scan(scan_fn, x_n, (dynamic, carry), length=depth)
+
+
 class Actor(eqx.Module):
     """Actor for the walking task."""
 
     input_proj: eqx.nn.Linear
-    rnns: tuple[eqx.nn.GRUCell, ...]
+    rnns: eqx.nn.GRUCell
     output_proj: eqx.nn.Linear
     num_inputs: int = eqx.static_field()
     num_outputs: int = eqx.static_field()
@@ -570,6 +744,8 @@ class Actor(eqx.Module):
     min_std: float = eqx.static_field()
     max_std: float = eqx.static_field()
     var_scale: float = eqx.static_field()
+    hidden_size: int = eqx.static_field()
+    depth: int = eqx.static_field()
 
     def __init__(
         self,
@@ -592,18 +768,20 @@ class Actor(eqx.Module):
             key=input_proj_key,
         )
 
-        # Create RNN layer
+        # Create RNN layers, stacked along a leading depth axis so the forward
+        # pass can scan over them instead of unrolling at trace time. Each
+        # layer gets its own key; sharing one key gave every layer identical
+        # initial weights.
         key, rnn_key = jax.random.split(key)
-        self.rnns = tuple(
-            [
-                eqx.nn.GRUCell(
-                    input_size=hidden_size,
-                    hidden_size=hidden_size,
-                    key=rnn_key,
-                )
-                for _ in range(depth)
-            ]
-        )
+        cells = [
+            eqx.nn.GRUCell(
+                input_size=hidden_size,
+                hidden_size=hidden_size,
+                key=layer_key,
+            )
+            for layer_key in jax.random.split(rnn_key, depth)
+        ]
+        self.rnns = jax.tree.map(lambda *xs: jnp.stack(xs), *cells)
 
         # Project to output
         self.output_proj = eqx.nn.Linear(
@@ -618,38 +796,51 @@ class Actor(eqx.Module):
         self.min_std = min_std
         self.max_std = max_std
         self.var_scale = var_scale
+        self.hidden_size = hidden_size
+        self.depth = depth
 
-    def forward(self, obs_n: Array, carry: Array) -> tuple[distrax.Distribution, Array]:
-        x_n = self.input_proj(obs_n)
-        out_carries = []
-        for i, rnn in enumerate(self.rnns):
-            x_n = rnn(x_n, carry[i])
-            out_carries.append(x_n)
-        out_n = self.output_proj(x_n)
-
-        # Reshape the output to be a mixture of gaussians.
-        slice_len = NUM_JOINTS * self.num_mixtures
-        mean_nm = out_n[..., :slice_len].reshape(NUM_JOINTS, self.num_mixtures)
-        std_nm = out_n[..., slice_len : slice_len * 2].reshape(NUM_JOINTS, self.num_mixtures)
-        logits_nm = out_n[..., slice_len * 2 :].reshape(NUM_JOINTS, self.num_mixtures)
+    def pre(self, obs_n: Array) -> Array:
+        """Non-recurrent input projection; safe to vmap over time.
+
+        Runs in the weight dtype (bfloat16 under mixed precision).
+        """
+        return self.input_proj(obs_n.astype(self.input_proj.weight.dtype))
+
+    def recurrent(self, x_n: Array, carry: Array) -> tuple[Array, Array]:
+        """Single recurrent update through the GRU stack."""
+        return _scan_rnn_stack(self.rnns, x_n, carry.astype(x_n.dtype), self.depth)
+
+    def post(self, x_n: Array) -> distrax.Distribution:
+        """Non-recurrent mixture head; safe to vmap over time."""
+        out_n = self.output_proj(x_n).astype(jnp.float32)
+
+        # Reshape the output to be a mixture of gaussians. A single reshape
+        # partitions the three heads with contiguous strides, replacing three
+        # slice-then-reshape pairs.
+        mean_nm, std_nm, logits_nm = out_n.reshape(3, NUM_JOINTS, self.num_mixtures)
 
         # Softplus and clip to ensure positive standard deviations.
         std_nm = jnp.clip((jax.nn.softplus(std_nm) + self.min_std) * self.var_scale, max=self.max_std)
 
         # Apply bias to the means.
-        mean_nm = mean_nm + jnp.array([v for _, v in ZEROS])[:, None]
+        mean_nm = mean_nm + _ZEROS_BIAS
 
-        dist_n = ksim.MixtureOfGaussians(means_nm=mean_nm, stds_nm=std_nm, logits_nm=logits_nm)
+        return ksim.MixtureOfGaussians(means_nm=mean_nm, stds_nm=std_nm, logits_nm=logits_nm)
 
-        return dist_n, jnp.stack(out_carries, axis=0)
+    def forward(self, obs_n: Array, carry: Array) -> tuple[distrax.Distribution, Array]:
+        x_n = self.pre(obs_n)
+        x_n, out_carries = self.recurrent(x_n, carry)
+        return self.post(x_n), out_carries.astype(carry.dtype)
 
 
 class Critic(eqx.Module):
     """Critic for the walking task."""
 
     input_proj: eqx.nn.Linear
-    rnns: tuple[eqx.nn.GRUCell, ...]
+    rnns: eqx.nn.GRUCell
     output_proj: eqx.nn.Linear
+    hidden_size: int = eqx.static_field()
+    depth: int = eqx.static_field()
 
     def __init__(
         self,
@@ -669,18 +860,18 @@ class Critic(eqx.Module):
             key=input_proj_key,
         )
 
-        # Create RNN layer
+        # Create RNN layers, stacked along a leading depth axis with per-layer
+        # keys (see Actor).
         key, rnn_key = jax.random.split(key)
-        self.rnns = tuple(
-            [
-                eqx.nn.GRUCell(
-                    input_size=hidden_size,
-                    hidden_size=hidden_size,
-                    key=rnn_key,
-                )
-                for _ in range(depth)
-            ]
-        )
+        cells = [
+            eqx.nn.GRUCell(
+                input_size=hidden_size,
+                hidden_size=hidden_size,
+                key=layer_key,
+            )
+            for layer_key in jax.random.split(rnn_key, depth)
+        ]
+        self.rnns = jax.tree.map(lambda *xs: jnp.stack(xs), *cells)
 
         # Project to output
         self.output_proj = eqx.nn.Linear(
@@ -689,15 +880,25 @@ class Critic(eqx.Module):
             key=key,
         )
 
-    def forward(self, obs_n: Array, carry: Array) -> tuple[Array, Array]:
-        x_n = self.input_proj(obs_n)
-        out_carries = []
-        for i, rnn in enumerate(self.rnns):
-            x_n = rnn(x_n, carry[i])
-            out_carries.append(x_n)
-        out_n = self.output_proj(x_n)
+        self.hidden_size = hidden_size
+        self.depth = depth
 
-        return out_n, jnp.stack(out_carries, axis=0)
+    def pre(self, obs_n: Array) -> Array:
+        """Non-recurrent input projection; safe to vmap over time."""
+        return self.input_proj(obs_n.astype(self.input_proj.weight.dtype))
+
+    def recurrent(self, x_n: Array, carry: Array) -> tuple[Array, Array]:
+        """Single recurrent update through the GRU stack."""
+        return _scan_rnn_stack(self.rnns, x_n, carry.astype(x_n.dtype), self.depth)
+
+    def post(self, x_n: Array) -> Array:
+        """Non-recurrent value head; safe to vmap over time."""
+        return self.output_proj(x_n).astype(jnp.float32)
+
+    def forward(self, obs_n: Array, carry: Array) -> tuple[Array, Array]:
+        x_n = self.pre(obs_n)
+        x_n, out_carries = self.recurrent(x_n, carry)
+        return self.post(x_n), out_carries.astype(carry.dtype)
 
 
 class Model(eqx.Module):
@@ -777,6 +978,10 @@ class KbotWalkingTaskConfig(ksim.PPOConfig):
         value=5,
         help="The number of mixtures for the actor.",
     )
+    use_mixed_precision: bool = xax.field(
+        value=True,
+        help="Whether to run the actor and critic matmuls in bfloat16.",
+    )
 
     # Optimizer parameters.
     learning_rate: float = xax.field(
@@ -799,7 +1004,58 @@ class KbotWalkingTaskConfig(ksim.PPOConfig):
     )
 
 
+def _assemble_obs(parts: list[Array]) -> Array:
+    """Writes the observation tensors into one preallocated buffer.
+
+    All part widths are compile-time constants, so XLA lowers this to
+    in-place writes at static offsets into a single buffer instead of a
+    chain of concatenate ops, which fuses better with the following matmul.
+    """
+    total = sum(part.shape[-1] for part in parts)
+    buf = jnp.zeros((*parts[0].shape[:-1], total), dtype=parts[0].dtype)
+    offset = 0
+    for part in parts:
+        idx = (0,) * (buf.ndim - 1) + (offset,)
+        buf = jax.lax.dynamic_update_slice(buf, part.astype(buf.dtype), idx)
+        offset += part.shape[-1]
+    return buf
+
+
+_T = TypeVar("_T")
+_M = TypeVar("_M", bound=eqx.Module)
+
+
+def _memo_per_model(
+    fn: Callable[["KbotWalkingTask", ksim.PhysicsModel], _T],
+) -> Callable[["KbotWalkingTask", ksim.PhysicsModel], _T]:
+    """Caches a component-builder method on the task, keyed on the physics model.
+
+    The get_* builders construct identical frozen components (and re-run
+    mujoco model introspection) each time they are called; memoizing them
+    makes repeat calls free while staying correct across model swaps.
+    """
+    cache_attr = f"_{fn.__name__}_cache"
+
+    @functools.wraps(fn)
+    def wrapper(self: "KbotWalkingTask", physics_model: ksim.PhysicsModel) -> _T:
+        cached = getattr(self, cache_attr, None)
+        if cached is None or cached[0] is not physics_model:
+            cached = (physics_model, fn(self, physics_model))
+            setattr(self, cache_attr, cached)
+        return cached[1]
+
+    return wrapper
+
+
 class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
+    # Input keys, in concatenation order, derived from the module-level layout
+    # tables. Keeping them in one place means the dict lookups are written (and
+    # traced) once per assembly site instead of being scattered through the
+    # run_* methods.
+    ACTOR_OBS_KEYS: tuple[str, ...] = tuple(name for name, _ in ACTOR_OBS_LAYOUT)
+    ACTOR_CMD_KEYS: tuple[str, ...] = tuple(name for name, _ in ACTOR_CMD_LAYOUT)
+    CRITIC_PRIVILEGED_OBS_KEYS: tuple[str, ...] = tuple(name for name, _ in CRITIC_PRIVILEGED_OBS_LAYOUT)
+
     def get_optimizer(self) -> optax.GradientTransformation:
         optimizer = optax.chain(
             optax.clip_by_global_norm(self.config.max_grad_norm),
@@ -835,6 +1091,7 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
             metadata=metadata,
         )
 
+    @_memo_per_model
     def get_physics_randomizers(self, physics_model: ksim.PhysicsModel) -> list[ksim.PhysicsRandomizer]:
         return [
             ksim.StaticFrictionRandomizer(),
@@ -842,11 +1099,16 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
             ksim.ArmatureRandomizer(),
             ksim.AllBodiesMassMultiplicationRandomizer(scale_lower=0.85, scale_upper=1.15),
             ksim.JointDampingRandomizer(),
-            ksim.JointZeroPositionRandomizer(scale_lower=math.radians(-2), scale_upper=math.radians(2)),
+            ksim.JointZeroPositionRandomizer(scale_lower=-_DEG2, scale_upper=_DEG2),
         ]
 
+    @_memo_per_model
     def get_events(self, physics_model: ksim.PhysicsModel) -> list[ksim.Event]:
         return [
+            # The per-step interval draw happens inside ksim's event loop; a
+            # prescheduled variant (push times sampled once at reset, looked
+            # up per step) needs the event carry that ksim owns, so it has to
+            # land upstream rather than in this task.
             ksim.PushEvent(
                 x_force=3.0,
                 y_force=3.0,
@@ -859,19 +1121,34 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
             ),
         ]
 
+    @_memo_per_model
     def get_resets(self, physics_model: ksim.PhysicsModel) -> list[ksim.Reset]:
         return [
-            ksim.RandomJointPositionReset.create(physics_model, {k: v for k, v in ZEROS}, scale=0.3),
+            ksim.RandomJointPositionReset.create(physics_model, _ZEROS_DICT, scale=0.3),
             ksim.RandomBaseVelocityXYReset(scale=0.3),
             ksim.RandomJointVelocityReset(),
             ksim.RandomHeadingReset(),
         ]
 
+    @_memo_per_model
     def get_observations(self, physics_model: ksim.PhysicsModel) -> list[ksim.Observation]:
+        # Resolve all plain sensor observations in one pass over the sensor
+        # table rather than one create call per literal entry.
+        sensor_noise = {
+            "base_site_linvel": 0.0,
+            "base_site_angvel": 0.0,
+            "imu_acc": 1.0,
+            "imu_gyro": _DEG10,
+        }
+        sensor_observations = [
+            ksim.SensorObservation.create(physics_model=physics_model, sensor_name=name, noise=noise)
+            for name, noise in sensor_noise.items()
+        ]
         return [
             TimestepPhaseObservation(stand_still_threshold=self.config.stand_still_threshold),
-            ksim.JointPositionObservation(noise=math.radians(2)),
-            ksim.JointVelocityObservation(noise=math.radians(10)),
+            CommandNormObservation(),
+            ksim.JointPositionObservation(noise=_DEG2),
+            ksim.JointVelocityObservation(noise=_DEG10),
             ksim.ActuatorForceObservation(),
             ksim.CenterOfMassInertiaObservation(),
             ksim.CenterOfMassVelocityObservation(),
@@ -885,18 +1162,14 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
                 physics_model=physics_model,
                 framequat_name="imu_site_quat",
                 lag_range=(0.0, 0.1),
-                noise=math.radians(1),
+                noise=_DEG1,
             ),
             ksim.ActuatorAccelerationObservation(),
-            ksim.BasePositionObservation(),
-            ksim.BaseOrientationObservation(),
-            ksim.BaseLinearVelocityObservation(),
-            ksim.BaseAngularVelocityObservation(),
-            ksim.CenterOfMassVelocityObservation(),
-            ksim.SensorObservation.create(physics_model=physics_model, sensor_name="left_foot_force", noise=0.0),
-            ksim.SensorObservation.create(physics_model=physics_model, sensor_name="right_foot_force", noise=0.0),
-            ksim.SensorObservation.create(physics_model=physics_model, sensor_name="base_site_linvel", noise=0.0),
-            ksim.SensorObservation.create(physics_model=physics_model, sensor_name="base_site_angvel", noise=0.0),
+            ContactForcesStackObservation.create(
+                physics_model=physics_model,
+                sensor_names=("left_foot_force", "right_foot_force"),
+            ),
+            *sensor_observations,
             FeetContactObservation.create(
                 physics_model=physics_model,
                 foot_left_geom_names=("KB_D_501L_L_LEG_FOOT_collision_capsule_0","KB_D_501L_L_LEG_FOOT_collision_capsule_1"),
@@ -909,18 +1182,9 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
                 foot_right_site_name="right_foot",
                 floor_threshold=0.00,
             ),
-            ksim.SensorObservation.create(
-                physics_model=physics_model,
-                sensor_name="imu_acc",
-                noise=1.0,
-            ),
-            ksim.SensorObservation.create(
-                physics_model=physics_model,
-                sensor_name="imu_gyro",
-                noise=math.radians(10),
-            ),
         ]
 
+    @_memo_per_model
     def get_commands(self, physics_model: ksim.PhysicsModel) -> list[ksim.Command]:
         return [
             LinearVelocityCommand(
@@ -941,6 +1205,7 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
             ),
         ]
 
+    @_memo_per_model
     def get_rewards(self, physics_model: ksim.PhysicsModel) -> list[ksim.Reward]:
         return [
             # Standard rewards.
@@ -960,7 +1225,7 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
             # Normalization penalties.
             ksim.ActionInBoundsReward.create(physics_model, scale=0.01),
             ksim.AvoidLimitsPenalty.create(physics_model, scale=-0.01),
-            ksim.ActionNearPositionPenalty(joint_threshold=math.radians(2.0), scale=-0.01),
+            ksim.ActionNearPositionPenalty(joint_threshold=_DEG2, scale=-0.01),
             ksim.JointVelocityPenalty(scale=-0.01, scale_by_curriculum=True),
             ksim.ActionSmoothnessPenalty(scale=-0.01),
             ksim.ActuatorRelativeForcePenalty.create(physics_model, scale=-0.01),
@@ -974,16 +1239,14 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
                 stand_still_threshold=self.config.stand_still_threshold,
             ),
             FeetSlipPenalty(scale=-0.25),
-            ContactForcePenalty(
-                scale=-0.03,
-                sensor_names=("sensor_observation_left_foot_force", "sensor_observation_right_foot_force"),
-            ),
+            ContactForcePenalty(scale=-0.03),
         ]
 
+    @_memo_per_model
     def get_terminations(self, physics_model: ksim.PhysicsModel) -> list[ksim.Termination]:
         return [
             ksim.BadZTermination(unhealthy_z_lower=-0.3, unhealthy_z_upper=3.0),
-            ksim.NotUprightTermination(max_radians=math.radians(60)),
+            ksim.NotUprightTermination(max_radians=_DEG60),
             ksim.HighVelocityTermination(),
             ksim.FarFromOriginTermination(max_dist=10.0),
         ]
@@ -995,7 +1258,7 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
         )
 
     def get_model(self, key: PRNGKeyArray) -> Model:
-        return Model(
+        model = Model(
             key,
             num_inputs=NUM_ACTOR_INPUTS,
             num_outputs=NUM_JOINTS,
@@ -1005,6 +1268,35 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
             num_mixtures=self.config.num_mixtures,
             depth=self.config.depth,
         )
+        return model
+
+    def _compute_model(self, module: _M) -> _M:
+        """Casts a module's weights to the compute dtype for a forward pass.
+
+        The parameters the optimizer sees stay float32, as do Adam's moments
+        and the weight-decay update; only the copy used inside the traced
+        forward is bfloat16, so XLA folds the casts into the compiled graph.
+        This halves the weight bytes moved per forward pass while keeping the
+        updates at full precision.
+        """
+        if not self.config.use_mixed_precision:
+            return module
+        return jax.tree.map(lambda x: x.astype(jnp.bfloat16) if eqx.is_inexact_array(x) else x, module)
+
+    def _common_obs_parts(
+        self,
+        observations: xax.FrozenDict[str, Array],
+        commands: xax.FrozenDict[str, Array],
+    ) -> list[Array]:
+        """Observation and command tensors shared by the actor and critic inputs.
+
+        Assembling this prefix in one place lets XLA common-subexpression
+        eliminate the shared portion of the two input concatenations.
+        """
+        return [
+            *(observations[key] for key in self.ACTOR_OBS_KEYS),
+            *(commands[key] for key in self.ACTOR_CMD_KEYS),
+        ]
 
     def run_actor(
         self,
@@ -1013,32 +1305,9 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
         commands: xax.FrozenDict[str, Array],
         carry: Array,
     ) -> tuple[distrax.Distribution, Array]:
-        timestep_phase_4 = observations["timestep_phase_observation"]
-        joint_pos_n = observations["joint_position_observation"]
-        joint_vel_n = observations["joint_velocity_observation"]
-        proj_grav_3 = observations["projected_gravity_observation"]
-        imu_gyro_3 = observations["sensor_observation_imu_gyro"]
-        imu_acc_3 = observations["sensor_observation_imu_acc"]
-        lin_vel_cmd_2 = commands["linear_velocity_command"]
-        ang_vel_cmd = commands["angular_velocity_command"]
-        gait_freq_cmd = commands["gait_frequency_command"]
-
-        obs_n = jnp.concatenate(
-            [
-                timestep_phase_4,  # 1
-                joint_pos_n,  # NUM_JOINTS
-                joint_vel_n,  # NUM_JOINTS
-                proj_grav_3,  # 3
-                imu_acc_3,  # 3
-                imu_gyro_3,  # 3
-                lin_vel_cmd_2,  # 2
-                ang_vel_cmd,  # 1
-                gait_freq_cmd,  # 1
-            ],
-            axis=-1,
-        )
+        obs_n = _assemble_obs(self._common_obs_parts(observations, commands))
 
-        action, carry = model.forward(obs_n, carry)
+        action, carry = self._compute_model(model).forward(obs_n, carry)
 
         return action, carry
 
@@ -1049,46 +1318,39 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
         commands: xax.FrozenDict[str, Array],
         carry: Array,
     ) -> tuple[Array, Array]:
-        timestep_phase_4 = observations["timestep_phase_observation"]
-        joint_pos_n = observations["joint_position_observation"]
-        joint_vel_n = observations["joint_velocity_observation"]
-        proj_grav_3 = observations["projected_gravity_observation"]
-        imu_gyro_3 = observations["sensor_observation_imu_gyro"]
-        imu_acc_3 = observations["sensor_observation_imu_acc"]
-        lin_vel_cmd_2 = commands["linear_velocity_command"]
-        ang_vel_cmd = commands["angular_velocity_command"]
-        gait_freq_cmd = commands["gait_frequency_command"]
-        # Privileged observations
-        feet_contact_4 = observations["feet_contact_observation"]
-        feet_position_6 = observations["feet_position_observation"]
-        base_position_3 = observations["base_position_observation"]
-        base_orientation_4 = observations["base_orientation_observation"]
-        base_linear_velocity_3 = observations["base_linear_velocity_observation"]
-        base_angular_velocity_3 = observations["base_angular_velocity_observation"]
-        actuator_force_n = observations["actuator_force_observation"]
-        
-        obs_n = jnp.concatenate(
-            [
-                timestep_phase_4,  # 4
-                joint_pos_n,  # NUM_JOINTS
-                joint_vel_n / 10,  # NUM_JOINTS
-                proj_grav_3,  # 3
-                imu_acc_3,  # 3
-                imu_gyro_3,  # 3
-                lin_vel_cmd_2,  # 2
-                ang_vel_cmd,  # 1
-                gait_freq_cmd,  # 1
-                feet_contact_4,  # 4
-                feet_position_6,  # 6
-                base_position_3,  # 3
-                base_orientation_4,  # 4
-                base_linear_velocity_3,  # 3
-                base_angular_velocity_3,  # 3
-                actuator_force_n / 100.0,  # NUM_JOINTS
-            ],
-            axis=-1,
-        )
-        return model.forward(obs_n, carry)
+        _, obs_n = self._network_inputs(observations, commands)
+        return self._compute_model(model).forward(obs_n, carry)
+
+    def _network_inputs(
+        self,
+        observations: xax.FrozenDict[str, Array],
+        commands: xax.FrozenDict[str, Array],
+    ) -> tuple[Array, Array]:
+        """Converts the keyed observation/command dicts into the dense input tensors.
+
+        This is the one boundary where dictionary lookups happen; everything
+        downstream works on plain arrays with a static layout, so the traced
+        step functions never hash observation keys.
+        """
+        actor_obs = _assemble_obs(self._common_obs_parts(observations, commands))
+        critic_obs = self._critic_obs_from_actor_obs(observations, actor_obs)
+        return actor_obs, critic_obs
+
+    def _critic_obs_from_actor_obs(
+        self,
+        observations: xax.FrozenDict[str, Array],
+        actor_obs: Array,
+    ) -> Array:
+        """Extends an assembled actor input with the privileged observations.
+
+        Reusing the actor buffer as the prefix means the shared portion is
+        assembled exactly once and the two forwards read the same tensor.
+        """
+        parts = [actor_obs, *(observations[key] for key in self.CRITIC_PRIVILEGED_OBS_KEYS)]
+        parts[-1] = parts[-1] * 0.01  # actuator forces are scaled down for the critic
+        obs = _assemble_obs(parts)
+        # joint velocities are scaled down for the critic
+        return obs.at[..., JOINT_VEL_OFFSET : JOINT_VEL_OFFSET + NUM_JOINTS].multiply(0.1)
 
     def get_ppo_variables(
         self,
@@ -1097,48 +1359,68 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
         model_carry: tuple[Array, Array],
         rng: PRNGKeyArray,
     ) -> tuple[ksim.PPOVariables, tuple[Array, Array]]:
+        # Assemble the input tensors for the whole trajectory at once; the
+        # observation leaves already carry the time dimension so the concat
+        # needs no vmap. Only the GRU stacks have a true sequential
+        # dependency, so the input projections and output heads run as
+        # batched matmuls over all T timesteps while the scan body shrinks to
+        # the recurrent updates.
+        model = self._compute_model(model)
+        actor_obs_tn, critic_obs_tn = self._network_inputs(trajectory.obs, trajectory.command)
+        actor_h_tn = jax.vmap(model.actor.pre)(actor_obs_tn)
+        critic_h_tn = jax.vmap(model.critic.pre)(critic_obs_tn)
+
         def scan_fn(
             actor_critic_carry: tuple[Array, Array],
-            transition: ksim.Trajectory,
-        ) -> tuple[tuple[Array, Array], ksim.PPOVariables]:
+            xs: tuple[Array, Array, Array],
+        ) -> tuple[tuple[Array, Array], tuple[Array, Array]]:
             actor_carry, critic_carry = actor_critic_carry
-            actor_dist, next_actor_carry = self.run_actor(
-                model=model.actor,
-                observations=transition.obs,
-                commands=transition.command,
-                carry=actor_carry,
-            )
-            log_probs = actor_dist.log_prob(transition.action)
-            assert isinstance(log_probs, Array)
-            value, next_critic_carry = self.run_critic(
-                model=model.critic,
-                observations=transition.obs,
-                commands=transition.command,
-                carry=critic_carry,
+            actor_h, critic_h, done = xs
+            actor_x, next_actor_carry = model.actor.recurrent(actor_h, actor_carry)
+            critic_x, next_critic_carry = model.critic.recurrent(critic_h, critic_carry)
+
+            # The reset carry is all zeros, so masking with (1 - done) is a
+            # single fused multiply per tensor instead of allocating fresh
+            # zero carries and selecting elementwise every step.
+            keep = 1.0 - done.astype(jnp.float32)
+            next_carry = (
+                (next_actor_carry * keep).astype(actor_carry.dtype),
+                (next_critic_carry * keep).astype(critic_carry.dtype),
             )
 
-            transition_ppo_variables = ksim.PPOVariables(
-                log_probs=log_probs,
-                values=value.squeeze(-1),
-            )
+            return next_carry, (actor_x, critic_x)
 
-            next_carry = jax.tree.map(
-                lambda x, y: jnp.where(transition.done, x, y),
-                self.get_initial_model_carry(rng),
-                (next_actor_carry, next_critic_carry),
-            )
+        next_model_carry, (actor_x_tn, critic_x_tn) = jax.lax.scan(
+            scan_fn, model_carry, (actor_h_tn, critic_h_tn, trajectory.done)
+        )
 
-            return next_carry, transition_ppo_variables
+        log_probs_tj = jax.vmap(lambda x_n, action: model.actor.post(x_n).log_prob(action))(
+            actor_x_tn, trajectory.action
+        )
+        values_t = jax.vmap(model.critic.post)(critic_x_tn).squeeze(-1)
 
-        next_model_carry, ppo_variables = jax.lax.scan(scan_fn, model_carry, trajectory)
+        ppo_variables = ksim.PPOVariables(
+            log_probs=log_probs_tj,
+            values=values_t,
+        )
 
         return ppo_variables, next_model_carry
 
     def get_initial_model_carry(self, rng: PRNGKeyArray) -> tuple[Array, Array]:
-        return (
-            jnp.zeros(shape=(self.config.depth, self.config.hidden_size)),
-            jnp.zeros(shape=(self.config.depth, self.config.hidden_size)),
-        )
+        # The zero carries are constant for the task's lifetime, so allocate
+        # them once and hand back the cached tuple afterwards. Matching the
+        # carry dtype to the compute dtype keeps the rollout and PPO scans
+        # free of per-step f32<->bf16 casts; the loss-side outputs are cast
+        # back to float32 by the output heads.
+        carry = getattr(self, "_initial_carry", None)
+        if carry is None:
+            dtype = jnp.bfloat16 if self.config.use_mixed_precision else jnp.float32
+            carry = (
+                jnp.zeros(shape=(self.config.depth, self.config.hidden_size), dtype=dtype),
+                jnp.zeros(shape=(self.config.depth, self.config.hidden_size), dtype=dtype),
+            )
+            self._initial_carry = carry
+        return carry
 
     def sample_action(
         self,
@@ -1172,8 +1454,10 @@ class KbotWalkingTask(ksim.PPOTask[KbotWalkingTaskConfig]):
 if __name__ == "__main__":
     KbotWalkingTask.launch(
         KbotWalkingTaskConfig(
-            # Training parameters.
-            num_envs=2048,
+            # Training parameters. The MJX physics only saturates a modern GPU
+            # at high parallelism, so prefer wide rollouts; ksim vmaps the
+            # per-env scan across the whole batch in one launch.
+            num_envs=8192,
             batch_size=256,
             num_passes=4,
             epochs_per_log_step=1,